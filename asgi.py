@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+验证码识别 HTTP 服务 (FastAPI ASGI 版本)
+由 Uvicorn (uvloop + httptools) 驱动，所有网络 I/O 在单线程事件循环中完成，
+不再为每个连接创建一个 OS 线程；OCR 计算投递到 server.py 的 OCR 工作线程池，
+事件循环只 await 对应的 Future。
+Base64 / 图片解码与 OCR 工作线程池直接复用 server.py。
+
+启动：
+    python asgi.py [port]
+    # 或
+    uvicorn asgi:app --host 0.0.0.0 --port 8080 --loop uvloop --http httptools
+"""
+from __future__ import annotations
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from http import HTTPStatus
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.staticfiles import StaticFiles
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from server import (
+    DEFAULT_PORT,
+    MAX_CONTENT_LENGTH,
+    OCR_TIMEOUT,
+    ALLOWED_ORIGIN,
+    PREWARM_OCR,
+    DOCS_DIR,
+    RecognizeError,
+    get_ocr_pool,
+    lookup_cached_result,
+    submit_ocr,
+    ocr_timeout_error,
+    finish_ocr,
+    render_status_page,
+    start_log_listener,
+    _dumps,
+    _loads,
+    new_request_id,
+    build_success_body,
+    validate_base64,
+)
+
+# ==================== 配置部分 ====================
+ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', 1))
+
+logger = logging.getLogger(__name__)
+
+async def _to_thread(func, *args):
+    # asyncio.to_thread 需要 Python 3.9，项目支持 3.8
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+# ==================== FastAPI 应用初始化 ====================
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 在 uvicorn 的每个工作进程中启动（包括直接以 uvicorn asgi:app 运行时）
+    start_log_listener()
+    if PREWARM_OCR:
+        async def _prewarm():
+            try:
+                await _to_thread(get_ocr_pool)
+            except Exception:
+                logger.exception("OCR 预热失败（忽略）", extra={'request_id': 'startup'})
+        asyncio.get_running_loop().create_task(_prewarm())
+    yield
+
+app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None, lifespan=lifespan)
+
+def _cors_headers() -> dict:
+    headers = {'Access-Control-Allow-Origin': ALLOWED_ORIGIN}
+    if ALLOWED_ORIGIN != '*':
+        headers['Access-Control-Allow-Credentials'] = 'true'
+    headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
+    headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
+    return headers
+
+def _json_response(obj: dict, status_code: int = 200) -> Response:
+    return Response(_dumps(obj), status_code=status_code, media_type='application/json')
+
+def _error_response(status_code: int | HTTPStatus, message: str, request_id: str | None) -> Response:
+    code = int(status_code)
+    resp = {
+        "success": False,
+        "code": code,
+        "message": message,
+        "request_id": request_id,
+        "data": None
+    }
+    logger.warning("请求错误 %s: %s", code, message, extra={'request_id': request_id or 'n/a'})
+    return _json_response(resp, code)
+
+@app.middleware('http')
+async def add_request_id_and_cors(request: Request, call_next):
+    request.state.request_id = new_request_id()
+    if request.method == 'OPTIONS':
+        response = Response(status_code=200)
+    else:
+        response = await call_next(request)
+    response.headers.update(_cors_headers())
+    return response
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    # 路由未命中 / 方法不允许统一按 server.py 的 404 文案返回
+    request_id = getattr(request.state, 'request_id', None)
+    if exc.status_code in (HTTPStatus.NOT_FOUND, HTTPStatus.METHOD_NOT_ALLOWED):
+        if request.method == 'POST':
+            message = "接口不存在，请使用 POST /recognize"
+        elif request.url.path.startswith('/docs'):
+            message = "资源不存在"
+        else:
+            message = "接口不存在"
+        return _error_response(HTTPStatus.NOT_FOUND, message, request_id)
+    return _error_response(exc.status_code, str(exc.detail), request_id)
+
+class _BodyTooLarge(Exception):
+    pass
+
+async def _read_body(request: Request) -> bytes:
+    """按 MAX_CONTENT_LENGTH 限制读取请求体；Content-Length 缺失（分块传输）时边读边检查"""
+    try:
+        content_length = int(request.headers.get('content-length', 0))
+    except ValueError:
+        content_length = 0
+    if content_length > MAX_CONTENT_LENGTH:
+        raise _BodyTooLarge()
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_CONTENT_LENGTH:
+            raise _BodyTooLarge()
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+@app.get('/')
+async def index(request: Request):
+    return HTMLResponse(render_status_page(str(request.base_url).rstrip('/'), " (ASGI版)"))
+
+@app.get('/health')
+async def health():
+    return _json_response({
+        "status": "healthy",
+        "service": "captcha-ocr",
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+    })
+
+def _parse_and_submit(body: bytes, request_id: str) -> tuple[bytes, str | None, Future | None]:
+    """
+    在线程池中执行：JSON 解析、base64 校验、查缓存（对整段 base64 做 blake2b）与解码投递，
+    都与请求体大小成正比，不能占用事件循环。命中缓存时返回 (缓存键, 结果, None)。
+    """
+    try:
+        data = _loads(body)
+    except json.JSONDecodeError as e:
+        raise RecognizeError(HTTPStatus.BAD_REQUEST, f"JSON 格式错误: {str(e)}")
+
+    if not isinstance(data, dict) or 'base64' not in data:
+        raise RecognizeError(HTTPStatus.BAD_REQUEST, "缺少 base64 字段")
+
+    base64_str = data['base64']
+    if not isinstance(base64_str, str) or len(base64_str) < 10:
+        raise RecognizeError(HTTPStatus.BAD_REQUEST, "base64 字符串无效或太短")
+
+    try:
+        pure = validate_base64(base64_str)
+    except ValueError as e:
+        raise RecognizeError(HTTPStatus.BAD_REQUEST, str(e))
+
+    cache_key, result_text = lookup_cached_result(pure)
+    if result_text is not None:
+        return cache_key, result_text, None
+    return cache_key, None, submit_ocr(pure, request_id)
+
+async def _recognize(body: bytes, request_id: str) -> tuple[str, bool]:
+    """recognize() 的异步版本：请求体处理放到线程池，事件循环只等待 OCR Future"""
+    cache_key, result_text, fut = await _to_thread(_parse_and_submit, body, request_id)
+    if fut is None:
+        return result_text, True
+    await asyncio.wait((asyncio.wrap_future(fut),), timeout=OCR_TIMEOUT)
+    if not fut.done():
+        raise ocr_timeout_error(fut, request_id)
+    return finish_ocr(cache_key, fut, request_id), False
+
+@app.post('/recognize')
+async def recognize(request: Request):
+    start_time = time.time()
+    request_id = request.state.request_id
+
+    try:
+        body = await _read_body(request)
+    except _BodyTooLarge:
+        return _error_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                               f"请求体过大，最大支持 {MAX_CONTENT_LENGTH//1024//1024}MB", request_id)
+    if not body:
+        return _error_response(HTTPStatus.BAD_REQUEST, "请求体为空", request_id)
+
+    try:
+        result_text, cached = await _recognize(body, request_id)
+    except RecognizeError as e:
+        return _error_response(e.status, e.message, request_id)
+
+    processing_time = (time.time() - start_time) * 1000.0
+
+    logger.info("识别成功: %s, 耗时: %.2fms%s", result_text, processing_time, " (缓存)" if cached else "",
+                extra={'request_id': request_id})
+    return Response(build_success_body(request_id, result_text, processing_time, cached),
+                    media_type='application/json')
+
+app.mount('/docs', StaticFiles(directory=DOCS_DIR, html=True), name='docs')
+
+# ==================== 主程序入口 ====================
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', DEFAULT_PORT))
+    if len(sys.argv) > 1:
+        try:
+            p = int(sys.argv[1])
+            if 1 <= p <= 65535:
+                port = p
+            else:
+                print(f"⚠️ 端口号 {p} 无效，使用默认端口 {port}")
+        except ValueError:
+            print(f"⚠️ 端口参数无效，使用默认端口 {port}")
+
+    logger.info("🚀 验证码识别服务 (ASGI) 启动: http://0.0.0.0:%d, workers=%d", port, ASGI_WORKERS,
+                extra={'request_id': 'startup'})
+    uvicorn.run('asgi:app', host='0.0.0.0', port=port, loop='uvloop', http='httptools',
+                workers=ASGI_WORKERS)
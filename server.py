@@ -10,43 +10,92 @@
 from __future__ import annotations
 
 import io
+import gzip
 import json
 import os
-import re
+import queue
 import sys
+import signal
+import string
 import time
-import uuid
 import base64
+import hashlib
+import inspect
+import socket
+import itertools
 import binascii
+import atexit
 import logging
+import logging.handlers
 import threading
 from http import HTTPStatus
 from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, unquote
 from pathlib import Path
 from mimetypes import guess_type
+from functools import lru_cache
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import NamedTuple
+from concurrent.futures import Future, wait as futures_wait
 
 try:
     import ddddocr
 except Exception:
     ddddocr = None
 
+try:
+    import numpy as np
+    import onnxruntime as ort
+except ImportError:
+    np = ort = None
+
+try:
+    import onnx
+except ImportError:
+    onnx = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import httptools
+except ImportError:
+    httptools = None
+
 from PIL import Image, UnidentifiedImageError
 
 # ==================== 配置部分 ====================
 DEFAULT_PORT = 8080
 MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 10 * 1024 * 1024))  # 10MB
-OCR_CONCURRENCY = int(os.environ.get('OCR_CONCURRENCY', 4))
+BODY_BUFFER_POOL_SIZE = int(os.environ.get('BODY_BUFFER_POOL_SIZE', 16))  # 复用的请求体缓冲区个数
+LARGE_IMAGE_THRESHOLD = int(os.environ.get('LARGE_IMAGE_THRESHOLD', 512 * 1024))  # 超过此大小的图片先在本地缩小
+OCR_CONCURRENCY = int(os.environ.get('OCR_CONCURRENCY', 4))  # OCR 工作线程数
+OCR_TIMEOUT = float(os.environ.get('OCR_TIMEOUT', 30))  # 单次识别最长等待秒数
+# 每个 OCR 工作线程各自持有一个 ONNX 会话，默认把 CPU 核数均分给各会话，避免线程数超订
+OCR_INTRA_OP_THREADS = int(os.environ.get('OCR_INTRA_OP_THREADS',
+                                          max(1, (os.cpu_count() or 1) // max(1, OCR_CONCURRENCY))))
+OCR_BETA = os.environ.get('OCR_BETA', 'false').lower() in ('1', 'true', 'yes')  # 使用 ddddocr 的 beta 浮点模型
+OCR_BATCH_SIZE = int(os.environ.get('OCR_BATCH_SIZE', 1))  # 每个工作线程单次前向合并的请求数，1 表示关闭微批
+OCR_BATCH_WAIT_MS = float(os.environ.get('OCR_BATCH_WAIT_MS', 5))  # 凑批最长等待毫秒数
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 4096))  # 0 表示关闭识别结果缓存
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 300))  # 秒
+WORKERS = int(os.environ.get('WORKERS', 1))  # 进程数（>1 时通过 SO_REUSEPORT 共享端口）
 ALLOWED_ORIGIN = os.environ.get('ALLOWED_ORIGIN', '*')
 PREWARM_OCR = os.environ.get('PREWARM_OCR', 'true').lower() in ('1', 'true', 'yes')
+STATIC_CACHE_SIZE = int(os.environ.get('STATIC_CACHE_SIZE', 128))  # 缓存的 docs 文件数
+STATIC_CACHE_MAX_FILE_SIZE = int(os.environ.get('STATIC_CACHE_MAX_FILE_SIZE', 1024 * 1024))  # 1MB
 
 # Path to repository dir (assumes server.py sits in repo root)
 BASE_DIR = Path(__file__).resolve().parent
 DOCS_DIR = BASE_DIR / 'docs'
 
 # ==================== Logging ====================
+# 导入时只做 basicConfig（根日志器已有 handler 时不改动）；由各入口在 fork 之后调用 start_log_listener，
+# 之后请求线程只把日志记录放入队列，格式化与写 stderr 由后台 QueueListener 线程完成
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(request_id)s - %(message)s"
-logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S')
 logger = logging.getLogger(__name__)
 
 class RequestIdFilter(logging.Filter):
@@ -55,66 +104,707 @@ class RequestIdFilter(logging.Filter):
             record.request_id = 'n/a'
         return True
 
+_log_stream_handler = logging.StreamHandler(sys.stderr)
+_log_stream_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S'))
+_log_stream_handler.addFilter(RequestIdFilter())
+_log_queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+_log_queue_handler.addFilter(RequestIdFilter())
+_log_listener: logging.handlers.QueueListener | None = None
+
+logging.basicConfig(level=logging.INFO, handlers=[_log_stream_handler])
 logging.getLogger().addFilter(RequestIdFilter())
 
-# ==================== OCR 工具（单例 + 并发限制） ====================
-_ocr_instance = None
+def start_log_listener():
+    """启动后台日志线程并让根日志器改走队列；多进程时必须在 fork 之后调用"""
+    global _log_listener
+    if _log_listener is not None:
+        return
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.handlers = [_log_queue_handler]
+    _log_listener = logging.handlers.QueueListener(_log_queue_handler.queue, _log_stream_handler,
+                                                   respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+# ==================== Request ID ====================
+# 进程号前缀 + 自增计数，进程内单调唯一；不读取系统随机数，也不涉及系统调用
+_request_id_prefix = f'{os.getpid():x}-'
+_request_ids = itertools.count(1)
+
+def new_request_id() -> str:
+    return f'{_request_id_prefix}{next(_request_ids):08x}'
+
+def _reset_request_id_prefix_after_fork():
+    global _request_id_prefix
+    _request_id_prefix = f'{os.getpid():x}-'
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_request_id_prefix_after_fork)
+
+# ==================== OCR 工具（工作线程池） ====================
+# OCR_CONCURRENCY 个常驻工作线程，每个线程持有独立的 DdddOcr 实例和自己的任务队列，
+# 请求按轮询投递 (img, Future) 并等待 Future；每个队列只有一个消费者，put 只唤醒对应的工作线程。
+# 开启微批且模型支持时，工作线程取到任务后在 OCR_BATCH_WAIT_MS 内继续收集至多 OCR_BATCH_SIZE 个任务，
+# 同宽度的图片拼成一个 batch 只调用一次 session.run。ddddocr 默认的动态量化模型不支持微批（见 _batch_invariant_model），
+# 需配合 OCR_BETA 使用浮点模型。
+class _OcrJob(NamedTuple):
+    img_bytes: bytes
+    future: Future
+
+class OcrWorker(threading.Thread):
+    def __init__(self, ocr, index: int):
+        super().__init__(name=f"ocr-worker-{index}", daemon=True)
+        self.ocr = ocr
+        self.queue: queue.SimpleQueue[_OcrJob] = queue.SimpleQueue()
+        self.batch_engine = None  # 由 OcrPool 在探测到模型支持多 batch 后设置
+
+    def run(self):
+        while True:
+            jobs = [job for job in self._collect(self.queue.get()) if job.future.set_running_or_notify_cancel()]
+            if self.batch_engine is not None and len(jobs) > 1:
+                self._run_batch(jobs)
+                continue
+            for job in jobs:
+                try:
+                    result = ocr_classify(self.ocr, job.img_bytes)
+                except BaseException as e:
+                    job.future.set_exception(e)
+                else:
+                    job.future.set_result(result)
+
+    def _collect(self, first: _OcrJob) -> list[_OcrJob]:
+        jobs = [first]
+        if self.batch_engine is None:
+            return jobs
+        deadline = time.monotonic() + OCR_BATCH_WAIT_MS / 1000.0
+        while len(jobs) < OCR_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            try:
+                jobs.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return jobs
+
+    def _run_batch(self, jobs: list[_OcrJob]):
+        # 复用 ddddocr 自身的预处理与 CTC 解码；只合并同宽度的图片，无需 padding
+        engine = self.batch_engine
+        groups: dict[int, list] = {}
+        for job in jobs:
+            try:
+                arr = engine._preprocess_image(Image.open(io.BytesIO(job.img_bytes)), False)
+            except BaseException as e:
+                job.future.set_exception(e)
+                continue
+            groups.setdefault(arr.shape[-1], []).append((job, arr))
+
+        input_name = engine.session.get_inputs()[0].name
+        for group in groups.values():
+            try:
+                outputs = engine.session.run(None, {input_name: np.concatenate([arr for _, arr in group])})[0]
+                results = [engine._process_text_output(outputs[:, i:i + 1, :]) for i in range(len(group))]
+            except BaseException as e:
+                for job, _ in group:
+                    job.future.set_exception(e)
+            else:
+                for (job, _), result in zip(group, results):
+                    job.future.set_result(result)
+
+# 动态量化算子：DynamicQuantizeLinear 对整个输入张量计算一个激活 scale，
+# 合批后每张图片的输出取决于同批的其它图片，结果与逐张识别不一致
+_DYNAMIC_QUANT_OPS = frozenset({'DynamicQuantizeLinear', 'DynamicQuantizeLSTM', 'ConvInteger', 'MatMulInteger'})
+
+@lru_cache(maxsize=None)
+def _batch_invariant_model(model_path: str) -> bool:
+    """模型结果是否与 batch 组成无关（不含动态量化算子）；未安装 onnx 时无法判断，返回 False"""
+    if onnx is None:
+        return False
+    model = onnx.load(model_path)
+    return not any(node.op_type in _DYNAMIC_QUANT_OPS for node in model.graph.node)
+
+@lru_cache(maxsize=None)
+def _batched_model(model_path: str) -> bytes:
+    """把模型输入的 batch 维改为动态（ddddocr 自带模型固定为 1）"""
+    model = onnx.load(model_path)
+    model.graph.input[0].type.tensor_type.shape.dim[0].dim_param = 'batch'
+    for output in model.graph.output:
+        output.type.tensor_type.ClearField('shape')
+    return model.SerializeToString()
+
+def _tune_ocr_session(ocr) -> str | None:
+    """按 OCR_INTRA_OP_THREADS 重建 ddddocr 内部的 ONNX 会话，返回模型路径；找不到会话时保持原样并返回 None"""
+    if ort is None:
+        return None
+    engine = getattr(ocr, 'ocr_engine', None)  # ddddocr >= 1.6
+    if engine is not None:
+        holder, attr = engine, 'session'
+    else:
+        holder, attr = ocr, '_DdddOcr__ort_session'  # ddddocr 1.4/1.5
+    session = getattr(holder, attr, None)
+    model_path = getattr(session, '_model_path', None)
+    if not model_path:
+        return None
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = OCR_INTRA_OP_THREADS
+    opts.inter_op_num_threads = 1
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    model = model_path
+    if engine is not None and OCR_BATCH_SIZE > 1 and _batch_invariant_model(model_path):
+        model = _batched_model(model_path)
+    setattr(holder, attr, ort.InferenceSession(model, sess_options=opts, providers=session.get_providers()))
+    return model_path
+
+def _batch_engine(ocr, model_path: str | None):
+    """返回可用于微批推理的 ddddocr OCR 引擎；版本或模型不支持时返回 None"""
+    engine = getattr(ocr, 'ocr_engine', None)
+    if (OCR_BATCH_SIZE <= 1 or engine is None or getattr(engine, 'use_import_onnx', False)
+            or not hasattr(engine, '_preprocess_image') or not hasattr(engine, '_process_text_output')):
+        return None
+    if not model_path or not _batch_invariant_model(model_path):
+        return None
+    try:
+        session = engine.session
+        probe = np.zeros((2, 1, 64, 64), dtype=np.float32)
+        outputs = session.run(None, {session.get_inputs()[0].name: probe})[0]
+    except Exception:
+        return None
+    # 输出需为 (seq_len, batch, num_classes)
+    if outputs.ndim != 3 or outputs.shape[1] != 2:
+        return None
+    return engine
+
+def _create_ocr() -> tuple[object, str | None]:
+    ocr = ddddocr.DdddOcr(beta=True) if OCR_BETA else ddddocr.DdddOcr()
+    return ocr, _tune_ocr_session(ocr)
+
+class OcrPool:
+    def __init__(self, size: int):
+        if ddddocr is None:
+            raise RuntimeError("ddddocr 未安装或导入失败")
+        created = [_create_ocr() for _ in range(max(1, size))]
+        self.workers = [OcrWorker(ocr, i) for i, (ocr, _) in enumerate(created)]
+        _probe_ocr_input_mode(self.workers[0].ocr)
+        if _batch_engine(*created[0]) is not None:
+            for w, (ocr, model_path) in zip(self.workers, created):
+                w.batch_engine = _batch_engine(ocr, model_path)
+        logger.info("OCR 微批: %s", f"最多 {OCR_BATCH_SIZE} 张 / {OCR_BATCH_WAIT_MS:g}ms"
+                    if self.workers[0].batch_engine is not None else "关闭", extra={'request_id': 'startup'})
+        for w in self.workers:
+            w.start()
+        self._dispatch = itertools.cycle(self.workers)
+
+    def submit(self, img_bytes: bytes) -> Future:
+        fut = Future()
+        next(self._dispatch).queue.put(_OcrJob(img_bytes, fut))
+        return fut
+
+_ocr_pool: OcrPool | None = None
 _ocr_lock = threading.Lock()
-_ocr_semaphore = threading.BoundedSemaphore(OCR_CONCURRENCY)
 
-def get_ocr():
-    global _ocr_instance
+def get_ocr_pool() -> OcrPool:
+    global _ocr_pool
     with _ocr_lock:
-        if _ocr_instance is None:
-            if ddddocr is None:
-                raise RuntimeError("ddddocr 未安装或导入失败")
-            _ocr_instance = ddddocr.DdddOcr()
-            logger.info("OCR 识别器初始化完成", extra={'request_id': 'startup'})
-    return _ocr_instance
+        if _ocr_pool is None:
+            _ocr_pool = OcrPool(OCR_CONCURRENCY)
+            logger.info("OCR 识别器初始化完成 (%d 个工作线程, 每个会话 %d 个计算线程)", len(_ocr_pool.workers),
+                        OCR_INTRA_OP_THREADS, extra={'request_id': 'startup'})
+    return _ocr_pool
+
+# ddddocr 不同版本的入参差异只在启动时探测一次：
+# 'img' -> classification(img=bytes)；'img_bytes' -> classification(img_bytes=bytes)；'pil' -> 需要 PIL Image
+_ocr_input_mode = 'img'
+
+def _input_mode_from_signature(classification) -> str | None:
+    try:
+        params = inspect.signature(classification).parameters
+    except (TypeError, ValueError):
+        return None
+    img = params.get('img')
+    if img is not None and (img.annotation is inspect.Parameter.empty or 'bytes' in str(img.annotation)):
+        return 'img'
+    if 'img_bytes' in params:
+        return 'img_bytes'
+    if img is not None:
+        return 'pil'
+    return None
+
+def _input_mode_from_call(ocr) -> str:
+    # 签名不可用时退回试调用；仅启动时执行一次
+    buf = io.BytesIO()
+    Image.new('RGB', (64, 32), 'white').save(buf, format='BMP')
+    probe = buf.getvalue()
+    for mode, kwargs in (('img', {'img': probe}), ('img_bytes', {'img_bytes': probe})):
+        try:
+            ocr.classification(**kwargs)
+        except TypeError:
+            continue
+        return mode
+    return 'pil'
+
+def _probe_ocr_input_mode(ocr):
+    global _ocr_input_mode
+    _ocr_input_mode = _input_mode_from_signature(ocr.classification) or _input_mode_from_call(ocr)
+    logger.info("ddddocr 入参模式: %s", _ocr_input_mode, extra={'request_id': 'startup'})
+
+def ocr_classify(ocr, img_bytes: bytes):
+    # 原始图片字节直接交给 ddddocr，仅在旧版本需要 PIL Image 时才转换
+    if _ocr_input_mode == 'img':
+        return ocr.classification(img=img_bytes)
+    if _ocr_input_mode == 'img_bytes':
+        return ocr.classification(img_bytes=img_bytes)
+    return ocr.classification(img=Image.open(io.BytesIO(img_bytes)).convert("RGB"))
+
+_ALNUM = frozenset(string.ascii_letters + string.digits)
+
+def clean_captcha_text(result) -> str:
+    """只保留 ASCII 字母与数字"""
+    return ''.join([c for c in str(result or '') if c in _ALNUM])
+
+# ==================== 请求体缓冲区 ====================
+# ThreadingHTTPServer 每个连接一个新线程，线程局部缓冲区无法跨请求复用，
+# 因此用一个共享的空闲列表保存 bytearray；按需增长，最多保留 BODY_BUFFER_POOL_SIZE 个
+_body_buffers: queue.SimpleQueue[bytearray] = queue.SimpleQueue()
+
+def acquire_body_buffer(size: int) -> bytearray:
+    try:
+        buf = _body_buffers.get_nowait()
+    except queue.Empty:
+        buf = None
+    if buf is None or len(buf) < size:
+        # 向上取整到 64KB，避免相近大小的请求反复重新分配
+        buf = bytearray((size + 0xFFFF) & ~0xFFFF)
+    return buf
+
+def release_body_buffer(buf: bytearray):
+    if _body_buffers.qsize() < BODY_BUFFER_POOL_SIZE:
+        _body_buffers.put(buf)
+
+# ==================== JSON helpers ====================
+def _loads(data: bytes | memoryview):
+    # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方统一捕获后者即可
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(str(data, 'utf-8'))
+
+def _dumps(obj: dict) -> bytes:
+    # 直接得到 UTF-8 bytes，非 ASCII 字符原样输出（等同 ensure_ascii=False）
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# 识别成功的响应结构固定，常量部分预先编码，运行时只拼接 request_id / captcha / 耗时 等字段；
+# 输出与 orjson 序列化同结构 dict 的结果逐字节一致
+_SUCCESS_HEAD = '{"success":true,"code":200,"message":"识别成功","request_id":"'.encode('utf-8')
+_SUCCESS_CAPTCHA = b'","data":{"captcha":"'
+_SUCCESS_TIME = b'","time_ms":'
+_SUCCESS_LENGTH = b',"length":'
+_SUCCESS_TAIL = {True: b',"cached":true}}', False: b',"cached":false}}'}
+_PLAIN_CHARS = _ALNUM | frozenset('-_')
+
+def build_success_body(request_id: str, captcha: str, time_ms: float, cached: bool) -> bytes:
+    time_ms = round(time_ms, 2)
+    if not (_PLAIN_CHARS.issuperset(request_id) and _ALNUM.issuperset(captcha)):
+        # 含需转义字符时走通用序列化
+        return _dumps({
+            "success": True,
+            "code": 200,
+            "message": "识别成功",
+            "request_id": request_id,
+            "data": {
+                "captcha": captcha,
+                "time_ms": time_ms,
+                "length": len(captcha),
+                "cached": cached
+            }
+        })
+    return b''.join((_SUCCESS_HEAD, request_id.encode('ascii'), _SUCCESS_CAPTCHA, captcha.encode('ascii'),
+                     _SUCCESS_TIME, repr(time_ms).encode('ascii'), _SUCCESS_LENGTH,
+                     str(len(captcha)).encode('ascii'), _SUCCESS_TAIL[cached]))
+
+# ==================== 识别结果缓存 ====================
+class ResultCache:
+    """线程安全的 LRU + TTL 缓存：图片 base64 摘要 -> 识别结果"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[bytes, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> str | None:
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: str):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+def result_cache_key(pure_base64: memoryview | bytes) -> bytes:
+    return hashlib.blake2b(pure_base64, digest_size=16).digest()
+
+_result_cache = ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
 
 # ==================== Base64 / Image helpers ====================
-def remove_base64_header(base64_str: str) -> str:
-    if not isinstance(base64_str, str):
-        return base64_str
-    if ',' in base64_str:
-        return base64_str.split(',', 1)[1]
-    return base64_str
-
-def validate_base64(base64_str: str) -> str:
-    base64_str = base64_str.strip()
-    pure = remove_base64_header(base64_str)
-    padding = len(pure) % 4
-    if padding:
-        pure += '=' * (4 - padding)
-    return pure
-
-def decode_base64_to_image(pure_base64: str) -> Image.Image:
-    if ddddocr is not None and hasattr(ddddocr, "base64_to_image"):
+_B64_WHITESPACE = frozenset(b' \t\n\r\x0b\x0c')
+
+def validate_base64(base64_data: str | bytes) -> memoryview:
+    """
+    去掉首尾空白与 data URL 头部，返回原缓冲区上的 memoryview（不拷贝）。
+    补齐 padding 推迟到解码时只对末尾不足 4 字节的部分进行。
+    """
+    if isinstance(base64_data, str):
         try:
-            img = ddddocr.base64_to_image(pure_base64)
-            if isinstance(img, Image.Image):
-                return img.convert("RGB")
-        except Exception:
-            logger.debug("ddddocr.base64_to_image failed; fallback to PIL", extra={'request_id': 'n/a'})
+            base64_data = base64_data.encode('ascii')
+        except UnicodeEncodeError as e:
+            raise ValueError("Base64 解码失败") from e
+    start, end = 0, len(base64_data)
+    while start < end and base64_data[start] in _B64_WHITESPACE:
+        start += 1
+    while end > start and base64_data[end - 1] in _B64_WHITESPACE:
+        end -= 1
+    comma = base64_data.find(b',', start, end)
+    if comma >= 0:
+        start = comma + 1
+    return memoryview(base64_data)[start:end]
+
+def _a2b_base64_strict(data) -> bytes:
+    if sys.version_info >= (3, 11):
+        return binascii.a2b_base64(data, strict_mode=True)
+    return base64.b64decode(data, validate=True)
 
+def decode_base64_to_bytes(pure_base64: memoryview | bytes, shrink_large: bool = True) -> bytes:
+    # binascii 直接在 memoryview 上解码，只有缺 padding 的末尾几个字节需要单独拷贝
+    mv = memoryview(pure_base64)
+    aligned = len(mv) - len(mv) % 4
     try:
-        img_bytes = base64.b64decode(pure_base64)
-    except binascii.Error as e:
-        raise ValueError("Base64 解码失败") from e
+        img_bytes = _a2b_base64_strict(mv[:aligned])
+        if aligned < len(mv):
+            tail = bytes(mv[aligned:])
+            img_bytes += _a2b_base64_strict(tail + b'=' * (4 - len(tail)))
+    except binascii.Error:
+        # 兼容带换行等非字母表字符的 base64（宽松模式会忽略这些字符）
+        data = bytes(mv)
+        try:
+            img_bytes = base64.b64decode(data + b'=' * (-len(data) % 4))
+        except binascii.Error as e:
+            raise ValueError("Base64 解码失败") from e
 
     if len(img_bytes) > MAX_CONTENT_LENGTH:
         raise ValueError("解码后图片过大")
 
+    # 只解析图片头部确认格式可识别，不做像素解码
     try:
-        img = Image.open(io.BytesIO(img_bytes))
-        return img.convert("RGB")
+        with Image.open(io.BytesIO(img_bytes)) as img:
+            if shrink_large and len(img_bytes) > LARGE_IMAGE_THRESHOLD:
+                with _shrink_slots:
+                    return _shrink_large_image(img) or img_bytes
     except UnidentifiedImageError as e:
         raise ValueError("无法识别的图片格式") from e
+    return img_bytes
+
+_OCR_INPUT_HEIGHT = 64  # ddddocr 默认模型的输入高度
+# 缩图在请求线程（ASGI 版为默认线程池）里执行，同样是 CPU 密集的像素解码，
+# 并发数与 OCR 工作线程数一致，避免大图突发时线程数无上限地抢占 CPU
+_shrink_slots = threading.BoundedSemaphore(OCR_CONCURRENCY)
+
+# PNG 能直接保存的模式；其余模式（CMYK、YCbCr、浮点 F 等）缩小后先转 RGB，ddddocr 之后同样会转灰度
+_PNG_MODES = frozenset({'1', 'L', 'LA', 'P', 'RGB', 'RGBA'})
+
+def _shrink_large_image(img: Image.Image) -> bytes | None:
+    """
+    大图按 ddddocr 的预处理（LANCZOS 缩放到 64 像素高）先缩小，再以无压缩 PNG 交给 OCR，
+    OCR 线程不必再解码整张大图。JPEG 利用 draft 让 libjpeg 直接按比例解码。
+    图片本身不高于 64 像素或缩小失败时返回 None，保持原数据交给 OCR。
+    """
+    width, height = img.size
+    if height <= _OCR_INPUT_HEIGHT:
+        return None
+    target = (int(width * (_OCR_INPUT_HEIGHT / height)), _OCR_INPUT_HEIGHT)
+    try:
+        if img.format == 'JPEG':
+            # draft 选取不小于请求尺寸的最小 DCT 缩放比例，留出 2 倍余量再做 LANCZOS
+            img.draft(img.mode, (target[0] * 2, target[1] * 2))
+        small = img.resize(target, Image.LANCZOS)
+        if small.mode not in _PNG_MODES:
+            small = small.convert('RGB')
+        buf = io.BytesIO()
+        small.save(buf, format='PNG', compress_level=0)
+    except (OSError, ValueError) as e:
+        logger.warning("大图缩小失败，交给 OCR 处理原图: %s", e)
+        return None
+    return buf.getvalue()
+
+# ==================== 识别流程 ====================
+# 三个入口共用：查缓存 -> 解码 -> 投递 OCR -> 清洗结果并写缓存。
+# 失败统一抛出 RecognizeError，由各入口转换成自己的错误响应。
+class RecognizeError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+def lookup_cached_result(pure: memoryview) -> tuple[bytes, str | None]:
+    """返回 (缓存键, 缓存的识别结果)；重复提交的同一张图片直接命中，跳过解码与 OCR"""
+    cache_key = result_cache_key(pure)
+    return cache_key, _result_cache.get(cache_key)
+
+def submit_ocr(pure: memoryview, request_id: str, shrink_large: bool = True) -> Future:
+    try:
+        img_bytes = decode_base64_to_bytes(pure, shrink_large)
+    except ValueError as e:
+        raise RecognizeError(HTTPStatus.BAD_REQUEST, str(e)) from e
+    except Exception as e:
+        logger.exception("解码图片时出错", extra={'request_id': request_id})
+        raise RecognizeError(HTTPStatus.INTERNAL_SERVER_ERROR, "图片解码失败") from e
+
+    try:
+        pool = get_ocr_pool()
+    except Exception as e:
+        logger.exception("获取 OCR 实例失败", extra={'request_id': request_id})
+        raise RecognizeError(HTTPStatus.INTERNAL_SERVER_ERROR, "OCR 初始化失败") from e
+    return pool.submit(img_bytes)
+
+def ocr_timeout_error(fut: Future, request_id: str) -> RecognizeError:
+    """取消仍在排队的任务，返回超时错误"""
+    fut.cancel()
+    logger.error("OCR 识别超时", extra={'request_id': request_id})
+    return RecognizeError(HTTPStatus.INTERNAL_SERVER_ERROR, "识别失败: 识别超时")
+
+def finish_ocr(cache_key: bytes, fut: Future, request_id: str) -> str:
+    """fut 已完成：清洗识别结果并写入缓存"""
+    try:
+        result = fut.result(timeout=0)
+    except Exception as e:
+        logger.exception("OCR 识别异常", extra={'request_id': request_id})
+        raise RecognizeError(HTTPStatus.INTERNAL_SERVER_ERROR, f"识别失败: {str(e)}") from e
+    result_text = clean_captcha_text(result)
+    _result_cache.put(cache_key, result_text)
+    return result_text
+
+def recognize(pure: memoryview, request_id: str) -> tuple[str, bool]:
+    """阻塞式识别，返回 (识别结果, 是否命中缓存)"""
+    cache_key, result_text = lookup_cached_result(pure)
+    if result_text is not None:
+        return result_text, True
+    fut = submit_ocr(pure, request_id)
+    futures_wait((fut,), timeout=OCR_TIMEOUT)
+    if not fut.done():
+        raise ocr_timeout_error(fut, request_id)
+    return finish_ocr(cache_key, fut, request_id), False
+
+# ==================== 预构建的响应片段 ====================
+def _build_cors_header_block() -> bytes:
+    headers = [('Access-Control-Allow-Origin', ALLOWED_ORIGIN)]
+    if ALLOWED_ORIGIN != '*':
+        headers.append(('Access-Control-Allow-Credentials', 'true'))
+    headers.append(('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'))
+    headers.append(('Access-Control-Allow-Headers', 'Content-Type, Authorization'))
+    return ''.join(f"{k}: {v}\r\n" for k, v in headers).encode('latin-1')
+
+_CORS_HEADER_BLOCK = _build_cors_header_block()
+
+_STATUS_TEMPLATE = """<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>验证码识别服务</title></head>
+<body>
+<h1>验证码识别HTTP服务{variant}</h1>
+<p>服务运行中。请访问 <a href="/docs">/docs</a> 获取交互式 API 文档与在线测试页面。</p>
+<p>本地访问: {server_url}</p>
+</body>
+</html>"""
+
+@lru_cache(maxsize=32)
+def render_status_page(server_url: str, variant: str = '') -> bytes:
+    return _STATUS_TEMPLATE.format(server_url=server_url, variant=variant).encode('utf-8')
+
+# ==================== 静态资源缓存 ====================
+class _StaticEntry(NamedTuple):
+    path: Path
+    data: bytes | None          # None 表示文件过大，不缓存内容，走 sendfile
+    gzip_data: bytes | None     # None 表示不提供 gzip 版本
+    mtime: float
+    etag: str
+    gzip_etag: str
+    content_type: str
+    last_modified: str
+
+def _resolve_docs_path(rel_path: str) -> Path:
+    # Prevent escaping DOCS_DIR
+    try:
+        candidate = (DOCS_DIR / unquote(rel_path).lstrip('/')).resolve()
+    except Exception as e:
+        raise ValueError("无效的路径") from e
+    try:
+        candidate.relative_to(DOCS_DIR.resolve())
+    except ValueError:
+        raise FileNotFoundError(rel_path)
+    if not candidate.is_file():
+        raise FileNotFoundError(rel_path)
+    return candidate
+
+@lru_cache(maxsize=STATIC_CACHE_SIZE)
+def _load_static_entry(rel_path: str) -> _StaticEntry:
+    """
+    首次访问时读取并缓存 docs 资源（进程内 LRU，修改 docs 后需重启服务）。
+    异常不会被 lru_cache 缓存，不存在的资源每次都会重新检查。
+    """
+    candidate = _resolve_docs_path(rel_path)
+    mime, _ = guess_type(str(candidate))
+    content_type = mime or 'application/octet-stream'
+    with open(candidate, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if st.st_size > STATIC_CACHE_MAX_FILE_SIZE:
+            data = gzip_data = None
+            digest = f"{st.st_size:x}-{st.st_mtime_ns:x}"
+        else:
+            data = f.read()
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            gzip_data = gzip.compress(data, 6)
+            if len(gzip_data) >= len(data):
+                gzip_data = None
+    return _StaticEntry(
+        path=candidate,
+        data=data,
+        gzip_data=gzip_data,
+        mtime=st.st_mtime,
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gzip"',
+        content_type=content_type,
+        last_modified=formatdate(st.st_mtime, usegmt=True),
+    )
+
+def static_not_modified(entry: _StaticEntry, if_none_match: str | None, if_modified_since: str | None) -> bool:
+    if if_none_match is not None:
+        tags = {t.strip() for t in if_none_match.split(',')}
+        tags = {t[2:] if t.startswith('W/') else t for t in tags}  # 弱比较；str.removeprefix 需要 3.9
+        return '*' in tags or entry.etag in tags or entry.gzip_etag in tags
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+        return int(entry.mtime) <= since
+    return False
 
 # ==================== HTTP 处理器 ====================
+class _RequestHeaders(dict):
+    """httptools 解析得到的请求头，键统一为小写；get 不区分大小写（代替 email.message.Message）"""
+
+    def get(self, name: str, default=None):
+        return dict.get(self, name.lower(), default)
+
+class _RequestHeadParser:
+    """httptools 回调对象，只收集请求行与请求头"""
+    __slots__ = ('url', 'headers', 'complete')
+
+    def __init__(self):
+        self.url = b''
+        self.headers = _RequestHeaders()
+        self.complete = False
+
+    def on_url(self, url: bytes):
+        self.url += url
+
+    def on_header(self, name: bytes, value: bytes):
+        key = name.decode('latin-1').lower()
+        value = value.decode('latin-1')
+        # 与 http.client.parse_headers 一致，重复的头取第一个
+        self.headers.setdefault(key, value)
+
+    def on_headers_complete(self):
+        self.complete = True
+
+def _crlf_line(line: bytes) -> bytes:
+    if line.endswith(b'\n') and not line.endswith(b'\r\n'):
+        return line[:-1] + b'\r\n'
+    return line
+
 class CaptchaHandler(BaseHTTPRequestHandler):
     """处理验证码识别请求"""
 
+    # 每个连接设置 TCP_NODELAY，避免 Nagle 算法延迟小的 JSON 响应
+    disable_nagle_algorithm = True
+
+    def parse_request(self) -> bool:
+        """
+        安装了 httptools 时用其 C 解析器解析请求行与请求头，替代 http.server 的逐行 Python 解析；
+        解析结果写入的属性与 BaseHTTPRequestHandler.parse_request 相同，后续路由逻辑不变。
+        """
+        if httptools is None:
+            return super().parse_request()
+
+        self.command = None
+        self.request_version = self.default_request_version
+        self.close_connection = True
+        self.requestline = str(self.raw_requestline, 'iso-8859-1').rstrip('\r\n')
+        words = self.requestline.split()
+        if not words:
+            return False
+        if len(words) >= 3 and words[-1].startswith('HTTP/'):
+            # 与标准库一致取最后一个词；请求行或请求头出错时 send_error 也要带上状态行
+            self.request_version = words[-1]
+
+        # 标准库也接受只用 \n 结尾的行；httptools 要求 \r\n，送入前统一换行符
+        head = [_crlf_line(self.raw_requestline)]
+        while True:
+            line = self.rfile.readline(65537)
+            if len(line) > 65536:
+                self.send_error(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Line too long")
+                return False
+            if line in (b'\r\n', b'\n', b''):
+                head.append(b'\r\n')
+                break
+            head.append(_crlf_line(line))
+            if len(head) > 101:
+                self.send_error(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Too many headers")
+                return False
+
+        callbacks = _RequestHeadParser()
+        parser = httptools.HttpRequestParser(callbacks)
+        try:
+            parser.feed_data(b''.join(head))
+        except httptools.HttpParserUpgrade:
+            pass
+        except httptools.HttpParserError:
+            self.send_error(HTTPStatus.BAD_REQUEST, f"Bad request syntax ({self.requestline!r})")
+            return False
+        if not callbacks.complete:
+            self.send_error(HTTPStatus.BAD_REQUEST, f"Bad request syntax ({self.requestline!r})")
+            return False
+
+        self.command = parser.get_method().decode('ascii')
+        self.path = callbacks.url.decode('iso-8859-1')
+        if self.path.startswith('//'):
+            self.path = '/' + self.path.lstrip('/')  # 与标准库一致，避免被当作 netloc
+        version = parser.get_http_version()
+        self.request_version = f'HTTP/{version}'
+        if version >= '2':
+            self.send_error(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Invalid HTTP version ({version})")
+            return False
+        self.headers = callbacks.headers
+
+        self.close_connection = not (self.protocol_version >= 'HTTP/1.1' and parser.should_keep_alive())
+        if (self.headers.get('Expect', '').lower() == '100-continue'
+                and self.protocol_version >= 'HTTP/1.1' and version >= '1.1'):
+            if not self.handle_expect_100():
+                return False
+        return True
+
     def log_message(self, format: str, *args):
         request_id = getattr(self, 'request_id', 'n/a')
         client_ip = self.client_address[0] if getattr(self, 'client_address', None) else 'unknown'
@@ -125,14 +815,10 @@ class CaptchaHandler(BaseHTTPRequestHandler):
         logger.info("%s - %s", client_ip, message, extra={'request_id': request_id})
 
     def _send_cors_headers(self):
-        origin = ALLOWED_ORIGIN
-        if origin == '*':
-            self.send_header('Access-Control-Allow-Origin', '*')
-        else:
-            self.send_header('Access-Control-Allow-Origin', origin)
-            self.send_header('Access-Control-Allow-Credentials', 'true')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type, Authorization')
+        # 预先拼好的 CORS 头直接追加到头部缓冲，省去逐个 send_header 的格式化
+        if not hasattr(self, '_headers_buffer'):
+            self._headers_buffer = []
+        self._headers_buffer.append(_CORS_HEADER_BLOCK)
 
     def _set_headers(self, status_code: int = 200, content_type: str = 'application/json'):
         self.send_response(status_code)
@@ -140,51 +826,114 @@ class CaptchaHandler(BaseHTTPRequestHandler):
         self._send_cors_headers()
         self.end_headers()
 
+    def _send_json_body(self, status_code: int, body: bytes):
+        # 状态行、头部与 JSON 响应体放进同一个缓冲区，一次 write 发出
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self._send_cors_headers()
+        self._headers_buffer.append(b"\r\n")
+        self._headers_buffer.append(body)
+        self.flush_headers()
+
     def _serve_static_file(self, rel_path: str):
         """
         Serve files from DOCS_DIR in a safe manner.
         rel_path: relative path under /docs (e.g., '' or 'index.html' or 'main.js')
+        小文件内容/gzip/ETag 缓存在内存中；支持 If-None-Match / If-Modified-Since 返回 304。
         """
-        # Normalize
-        safe_rel = Path(unquote(rel_path)).resolve()
-        # Prevent escaping DOCS_DIR
         try:
-            # Build candidate path
-            candidate = (DOCS_DIR / rel_path.lstrip('/')).resolve()
-        except Exception:
+            entry = _load_static_entry(rel_path)
+        except ValueError:
             self._send_error_response(HTTPStatus.BAD_REQUEST, "无效的路径")
             return
-
-        # Ensure candidate is inside DOCS_DIR
-        try:
-            candidate.relative_to(DOCS_DIR.resolve())
-        except Exception:
+        except FileNotFoundError:
             self._send_error_response(HTTPStatus.NOT_FOUND, "资源不存在")
             return
+        except OSError:
+            logger.exception("静态资源读取失败", extra={'request_id': getattr(self, 'request_id', 'n/a')})
+            self._send_error_response(HTTPStatus.INTERNAL_SERVER_ERROR, "静态资源读取失败")
+            return
 
-        if not candidate.exists() or not candidate.is_file():
-            self._send_error_response(HTTPStatus.NOT_FOUND, "资源不存在")
+        use_gzip = entry.gzip_data is not None and 'gzip' in self.headers.get('Accept-Encoding', '')
+        etag = entry.gzip_etag if use_gzip else entry.etag
+
+        if static_not_modified(entry, self.headers.get('If-None-Match'), self.headers.get('If-Modified-Since')):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_static_headers(entry, etag)
+            self.end_headers()
             return
 
-        mime, _ = guess_type(str(candidate))
-        content_type = mime or 'application/octet-stream'
+        if entry.data is None:
+            self._sendfile_static(entry)
+            return
+
+        body = entry.gzip_data if use_gzip else entry.data
         try:
-            with open(candidate, 'rb') as f:
-                content = f.read()
             self.send_response(200)
-            self.send_header('Content-Type', content_type)
-            self._send_cors_headers()
+            self.send_header('Content-Type', entry.content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if use_gzip:
+                self.send_header('Content-Encoding', 'gzip')
+            self._send_static_headers(entry, etag)
             self.end_headers()
-            self.wfile.write(content)
+            self.wfile.write(body)
+        except Exception:
+            logger.exception("静态资源发送失败", extra={'request_id': getattr(self, 'request_id', 'n/a')})
+            # If write fails, just ignore
+
+    def _send_static_headers(self, entry: _StaticEntry, etag: str):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', entry.last_modified)
+        self.send_header('Cache-Control', 'public, max-age=3600')
+        if entry.gzip_data is not None:
+            self.send_header('Vary', 'Accept-Encoding')
+        self._send_cors_headers()
+
+    def _sendfile_static(self, entry: _StaticEntry):
+        """大文件不进缓存，直接 sendfile 零拷贝发送"""
+        try:
+            with open(entry.path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                # TCP_CORK: 头部与文件内容合并成完整报文再发出 (类似 nginx tcp_nopush)
+                self._set_tcp_cork(True)
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', entry.content_type)
+                    self.send_header('Content-Length', str(size))
+                    self._send_static_headers(entry, entry.etag)
+                    self.end_headers()
+                    self.wfile.flush()
+                    if hasattr(os, 'sendfile'):
+                        # 零拷贝：内核直接把文件页送入 socket 缓冲区
+                        out_fd = self.connection.fileno()
+                        offset = 0
+                        while offset < size:
+                            sent = os.sendfile(out_fd, f.fileno(), offset, size - offset)
+                            if sent == 0:
+                                break
+                            offset += sent
+                    else:
+                        self.wfile.write(f.read())
+                finally:
+                    self._set_tcp_cork(False)
         except Exception:
             logger.exception("静态资源读取失败", extra={'request_id': getattr(self, 'request_id', 'n/a')})
             # If write fails, just ignore
 
+    def _set_tcp_cork(self, enabled: bool):
+        if not hasattr(socket, 'TCP_CORK'):
+            return
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1 if enabled else 0)
+        except OSError:
+            pass
+
     def do_OPTIONS(self):
         self._set_headers(200)
 
     def do_GET(self):
-        self.request_id = uuid.uuid4().hex
+        self.request_id = new_request_id()
         parsed = urlparse(self.path)
         path = parsed.path
 
@@ -203,7 +952,7 @@ class CaptchaHandler(BaseHTTPRequestHandler):
         # Root status page
         if path == '/':
             self._set_headers(200, 'text/html')
-            self.wfile.write(self._generate_status_page().encode('utf-8'))
+            self.wfile.write(self._generate_status_page())
             return
 
         # Health
@@ -214,14 +963,14 @@ class CaptchaHandler(BaseHTTPRequestHandler):
                 "service": "captcha-ocr",
                 "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
             }
-            self.wfile.write(json.dumps(resp).encode('utf-8'))
+            self.wfile.write(_dumps(resp))
             return
 
         self._send_error_response(HTTPStatus.NOT_FOUND, "接口不存在")
 
     def do_POST(self):
         start_time = time.time()
-        self.request_id = uuid.uuid4().hex
+        self.request_id = new_request_id()
 
         try:
             if self.path != '/recognize':
@@ -241,75 +990,45 @@ class CaptchaHandler(BaseHTTPRequestHandler):
                                           f"请求体过大，最大支持 {MAX_CONTENT_LENGTH//1024//1024}MB")
                 return
 
-            post_data = self.rfile.read(content_length)
+            # 请求体读入复用的缓冲区，解析完 JSON 即归还（解析结果不引用缓冲区）
+            buf = acquire_body_buffer(content_length)
             try:
-                data = json.loads(post_data.decode('utf-8'))
+                with memoryview(buf) as view:
+                    received = self._read_body_into(view[:content_length])
+                    with view[:received] as post_data:
+                        data = _loads(post_data)
             except json.JSONDecodeError as e:
                 self._send_error_response(HTTPStatus.BAD_REQUEST, f"JSON 格式错误: {str(e)}")
                 return
+            finally:
+                release_body_buffer(buf)
 
             if 'base64' not in data:
                 self._send_error_response(HTTPStatus.BAD_REQUEST, "缺少 base64 字段")
                 return
 
             base64_str = data['base64']
-            if not base64_str or len(base64_str) < 10:
+            if not isinstance(base64_str, str) or len(base64_str) < 10:
                 self._send_error_response(HTTPStatus.BAD_REQUEST, "base64 字符串无效或太短")
                 return
 
             try:
                 pure = validate_base64(base64_str)
-                img = decode_base64_to_image(pure)
             except ValueError as e:
                 self._send_error_response(HTTPStatus.BAD_REQUEST, str(e))
                 return
-            except Exception:
-                logger.exception("解码图片时出错", extra={'request_id': self.request_id})
-                self._send_error_response(HTTPStatus.INTERNAL_SERVER_ERROR, "图片解码失败")
-                return
 
             try:
-                ocr = get_ocr()
-            except Exception:
-                logger.exception("获取 OCR 实例失败", extra={'request_id': self.request_id})
-                self._send_error_response(HTTPStatus.INTERNAL_SERVER_ERROR, "OCR 初始化失败")
+                result_text, cached = recognize(pure, self.request_id)
+            except RecognizeError as e:
+                self._send_error_response(e.status, e.message)
                 return
 
-            with _ocr_semaphore:
-                try:
-                    # 尝试不同参数兼容 ddddocr 版本
-                    try:
-                        result = ocr.classification(img=img)
-                    except TypeError:
-                        buf = io.BytesIO()
-                        img.save(buf, format='PNG')
-                        img_bytes = buf.getvalue()
-                        try:
-                            result = ocr.classification(img_bytes=img_bytes)
-                        except TypeError:
-                            result = ocr.classification(img=img)
-                except Exception as e:
-                    logger.exception("OCR 识别异常", extra={'request_id': self.request_id})
-                    self._send_error_response(HTTPStatus.INTERNAL_SERVER_ERROR, f"识别失败: {str(e)}")
-                    return
-
             processing_time = (time.time() - start_time) * 1000.0
-            result_text = ''.join(re.findall(r'[A-Za-z0-9]', str(result or '')))
-
-            response = {
-                "success": True,
-                "code": 200,
-                "message": "识别成功",
-                "request_id": self.request_id,
-                "data": {
-                    "captcha": result_text,
-                    "time_ms": round(processing_time, 2),
-                    "length": len(result_text)
-                }
-            }
-            self._set_headers(HTTPStatus.OK)
-            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8'))
-            logger.info("识别成功: %s, 耗时: %.2fms", result_text, processing_time, extra={'request_id': self.request_id})
+
+            self._send_json_body(HTTPStatus.OK, build_success_body(self.request_id, result_text, processing_time, cached))
+            logger.info("识别成功: %s, 耗时: %.2fms%s", result_text, processing_time, " (缓存)" if cached else "",
+                        extra={'request_id': self.request_id})
         except Exception:
             logger.exception("请求处理出错", extra={'request_id': getattr(self, 'request_id', 'n/a')})
             try:
@@ -317,19 +1036,21 @@ class CaptchaHandler(BaseHTTPRequestHandler):
             except Exception:
                 pass
 
-    def _generate_status_page(self) -> str:
-        host, port = self.server.server_address
+    def _read_body_into(self, view: memoryview) -> int:
+        """读满 view 或直到连接关闭，返回实际读取的字节数"""
+        received = 0
+        with view:
+            while received < len(view):
+                n = self.rfile.readinto(view[received:])
+                if not n:
+                    break
+                received += n
+        return received
+
+    def _generate_status_page(self) -> bytes:
+        host, port = self.server.server_address[:2]
         display_host = host if host != '0.0.0.0' else 'localhost'
-        server_url = f"http://{display_host}:{port}"
-        return f"""<!doctype html>
-<html>
-<head><meta charset="utf-8"><title>验证码识别服务</title></head>
-<body>
-<h1>验证码识别HTTP服务</h1>
-<p>服务运行中。请访问 <a href="/docs">/docs</a> 获取交互式 API 文档与在线测试页面。</p>
-<p>本地访问: {server_url}</p>
-</body>
-</html>"""
+        return render_status_page(f"http://{display_host}:{port}")
 
     def _send_error_response(self, status_code: int | HTTPStatus, message: str):
         code = int(status_code.value if isinstance(status_code, HTTPStatus) else status_code)
@@ -341,25 +1062,73 @@ class CaptchaHandler(BaseHTTPRequestHandler):
             "data": None
         }
         try:
-            self._set_headers(code)
-            self.wfile.write(json.dumps(resp, ensure_ascii=False).encode('utf-8'))
+            self._send_json_body(code, _dumps(resp))
         except Exception:
             pass
         logger.warning("请求错误 %s: %s", code, message, extra={'request_id': getattr(self, 'request_id', 'n/a')})
 
 # ==================== 服务启动 ====================
-def run_server(port: int | None = None):
+class ReusePortServer(ThreadingHTTPServer):
+    """开启 SO_REUSEPORT，多个进程可各自 bind 同一端口，由内核分发新连接"""
+
+    def server_bind(self):
+        if hasattr(socket, 'SO_REUSEPORT'):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+def _start_prewarm():
+    def _prewarm():
+        try:
+            get_ocr_pool()
+        except Exception:
+            logger.exception("OCR 预热失败（忽略）", extra={'request_id': 'startup'})
+    t = threading.Thread(target=_prewarm, daemon=True)
+    t.start()
+
+def _fork_workers(workers: int) -> list[int]:
+    """
+    fork 出 workers-1 个子进程，返回子进程 pid 列表（子进程中返回空列表）。
+    必须在启动任何线程（日志监听、OCR 工作线程、预热线程）之前调用。
+    """
+    children = []
+    for _ in range(workers - 1):
+        pid = os.fork()
+        if pid == 0:
+            return []
+        children.append(pid)
+    return children
+
+def run_server(port: int | None = None, workers: int | None = None):
     if port is None:
         port = int(os.environ.get('PORT', DEFAULT_PORT))
+    if workers is None:
+        workers = WORKERS
+    if workers > 1 and not (hasattr(os, 'fork') and hasattr(socket, 'SO_REUSEPORT')):
+        logger.warning("当前平台不支持 fork/SO_REUSEPORT，使用单进程", extra={'request_id': 'startup'})
+        workers = 1
+
+    children = _fork_workers(workers) if workers > 1 else []
+    start_log_listener()
+    is_parent = workers == 1 or bool(children)
+    if children:
+        # 父进程收到 SIGTERM 时走正常退出流程，顺带结束子进程
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     server_address = ('0.0.0.0', port)
-    httpd = ThreadingHTTPServer(server_address, CaptchaHandler)
+    # 只有多进程时才共享端口；单进程保持默认行为，重复启动会因 EADDRINUSE 失败
+    server_class = ReusePortServer if workers > 1 else ThreadingHTTPServer
+    httpd = server_class(server_address, CaptchaHandler)
+
+    if PREWARM_OCR:
+        _start_prewarm()
 
     actual_port = httpd.server_address[1]
-    logger.info("=" * 60, extra={'request_id': 'startup'})
-    logger.info("🚀 验证码识别服务启动成功!", extra={'request_id': 'startup'})
-    logger.info("📡 监听地址: http://0.0.0.0:%d", actual_port, extra={'request_id': 'startup'})
-    logger.info("OCR 并发限制: %d", OCR_CONCURRENCY, extra={'request_id': 'startup'})
-    logger.info("=" * 60, extra={'request_id': 'startup'})
+    if is_parent:
+        logger.info("=" * 60, extra={'request_id': 'startup'})
+        logger.info("🚀 验证码识别服务启动成功!", extra={'request_id': 'startup'})
+        logger.info("📡 监听地址: http://0.0.0.0:%d", actual_port, extra={'request_id': 'startup'})
+        logger.info("进程数: %d, OCR 工作线程数: %d/进程", workers, OCR_CONCURRENCY, extra={'request_id': 'startup'})
+        logger.info("=" * 60, extra={'request_id': 'startup'})
 
     try:
         httpd.serve_forever()
@@ -370,6 +1139,13 @@ def run_server(port: int | None = None):
     except Exception:
         logger.exception("服务异常停止", extra={'request_id': 'startup'})
         raise
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
 
 # ==================== 主程序入口 ====================
 if __name__ == '__main__':
@@ -393,13 +1169,4 @@ if __name__ == '__main__':
         print("请运行: pip install -r requirements.txt")
         sys.exit(1)
 
-    if PREWARM_OCR:
-        def _prewarm():
-            try:
-                get_ocr()
-            except Exception:
-                logger.exception("OCR 预热失败（忽略）", extra={'request_id': 'startup'})
-        t = threading.Thread(target=_prewarm, daemon=True)
-        t.start()
-
     run_server(port)
@@ -0,0 +1,66 @@
+"""OCR 微批：合批推理的结果必须与逐张识别一致"""
+import io
+import random
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip('onnx')
+pytest.importorskip('ddddocr')
+from PIL import Image, ImageDraw, ImageFont
+
+import server
+
+def _captchas(count: int, seed: int = 7) -> list[bytes]:
+    # 背景亮度、噪点和字号差异要足够大，才能暴露按批计算量化尺度带来的串扰
+    rng = random.Random(seed)
+    images = []
+    for _ in range(count):
+        background = tuple(rng.randint(0, 255) for _ in range(3))
+        img = Image.new('RGB', (120, 40), background)
+        draw = ImageDraw.Draw(img)
+        for _ in range(rng.randint(0, 400)):
+            draw.point((rng.randrange(120), rng.randrange(40)), fill=tuple(rng.randrange(256) for _ in range(3)))
+        for _ in range(rng.randint(0, 4)):
+            draw.line([(rng.randrange(120), rng.randrange(40)) for _ in range(2)],
+                      fill=tuple(rng.randrange(256) for _ in range(3)), width=rng.randint(1, 3))
+        text = ''.join(rng.choice('abcdefhkmnprstuvwxyzABEFHK2345678') for _ in range(rng.randint(3, 6)))
+        draw.text((rng.randint(2, 20), rng.randint(0, 10)), text,
+                  fill=tuple(255 - c for c in background), font=ImageFont.load_default(size=rng.randint(18, 28)))
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        images.append(buf.getvalue())
+    return images
+
+def _run_batch(ocr, engine, images: list[bytes]) -> list[str]:
+    worker = server.OcrWorker(ocr, 0)
+    worker.batch_engine = engine
+    jobs = [server._OcrJob(img, Future()) for img in images]
+    worker._run_batch(jobs)
+    return [job.future.result(timeout=0) for job in jobs]
+
+def test_default_model_refuses_batching(monkeypatch):
+    monkeypatch.setattr(server, 'OCR_BATCH_SIZE', 8)
+    ocr, model_path = server._create_ocr()
+    assert not server._batch_invariant_model(model_path)
+    assert server._batch_engine(ocr, model_path) is None
+
+def test_beta_model_enables_batching_in_pool(monkeypatch):
+    monkeypatch.setattr(server, 'OCR_BATCH_SIZE', 8)
+    monkeypatch.setattr(server, 'OCR_BETA', True)
+    pool = server.OcrPool(2)
+    assert all(w.batch_engine is not None for w in pool.workers)
+    image = _captchas(1)[0]
+    assert pool.submit(image).result(timeout=30) == server.ocr_classify(pool.workers[0].ocr, image)
+
+def test_batched_output_matches_per_image(monkeypatch):
+    monkeypatch.setattr(server, 'OCR_BATCH_SIZE', 8)
+    monkeypatch.setattr(server, 'OCR_BETA', True)  # 浮点模型，不含动态量化算子
+    ocr, model_path = server._create_ocr()
+    engine = server._batch_engine(ocr, model_path)
+    assert engine is not None
+
+    images = _captchas(64)
+    expected = [server.ocr_classify(ocr, img) for img in images]
+    for start in range(0, len(images), 8):
+        assert _run_batch(ocr, engine, images[start:start + 8]) == expected[start:start + 8]
@@ -0,0 +1,44 @@
+"""请求头解析：httptools 与 http.server 自带解析对同一请求给出相同的响应"""
+import socket
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import server
+
+PARSERS = ['stdlib', pytest.param('httptools', marks=pytest.mark.skipif(
+    server.httptools is None, reason="httptools 未安装"))]
+
+@pytest.fixture(params=PARSERS)
+def address(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(server, 'httptools', None)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), server.CaptchaHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+def _status_line(response: bytes) -> bytes:
+    return response.split(b'\r\n', 1)[0]
+
+def _exchange(address, raw: bytes) -> bytes:
+    with socket.create_connection(address, timeout=5) as sock:
+        sock.sendall(raw)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return b''.join(chunks)
+
+def test_lf_only_line_endings(address):
+    response = _exchange(address, b'GET /health HTTP/1.1\nHost: a\nConnection: close\n\n')
+    assert _status_line(response).split(b' ', 2)[:2] == [b'HTTP/1.0', b'200']
+    assert b'"healthy"' in response
+
+def test_request_line_with_extra_words_gets_status_line(address):
+    response = _exchange(address, b'GET /he alth HTTP/1.1\r\nHost: a\r\n\r\n')
+    assert _status_line(response).split(b' ', 2)[:2] == [b'HTTP/1.0', b'400']
+    assert b'Bad request syntax' in response
@@ -0,0 +1,35 @@
+"""大图预缩小：PNG 无法直接保存的图片模式也要缩小成功，不能让请求失败"""
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+import server
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format=fmt)
+    return base64.b64encode(buf.getvalue())
+
+@pytest.mark.parametrize('mode, fmt', [
+    ('CMYK', 'JPEG'),
+    ('F', 'TIFF'),
+    ('CMYK', 'TIFF'),
+    ('PA', 'TIFF'),
+    ('RGB', 'PNG'),
+])
+def test_shrinks_modes_png_cannot_store(monkeypatch, mode, fmt):
+    monkeypatch.setattr(server, 'LARGE_IMAGE_THRESHOLD', 0)
+    img = Image.linear_gradient('L').resize((300, 150)).convert(mode)
+    shrunk = server.decode_base64_to_bytes(_encode(img, fmt))
+    with Image.open(io.BytesIO(shrunk)) as result:
+        assert result.format == 'PNG'
+        assert result.size == (128, 64)
+
+def test_shrink_failure_keeps_original_bytes(monkeypatch):
+    monkeypatch.setattr(server, 'LARGE_IMAGE_THRESHOLD', 0)
+    buf = io.BytesIO()
+    Image.linear_gradient('L').resize((300, 150)).save(buf, format='JPEG')
+    truncated = buf.getvalue()[:len(buf.getvalue()) // 2]
+    assert server.decode_base64_to_bytes(base64.b64encode(truncated)) == truncated
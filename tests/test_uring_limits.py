@@ -0,0 +1,40 @@
+"""io_uring 版本的请求大小限制：超限请求在读完之前就得到错误响应"""
+from http import HTTPStatus
+
+import pytest
+
+pytest.importorskip('liburing')
+httptools = pytest.importorskip('httptools')
+
+import uring_server
+from server import MAX_CONTENT_LENGTH
+
+def _feed(data: bytes) -> uring_server._Conn:
+    conn = uring_server._Conn(-1)
+    try:
+        conn.parser.feed_data(data)
+    except httptools.HttpParserError:
+        assert conn.rejected
+    return conn
+
+def _errors(conn: uring_server._Conn) -> list:
+    return [req.error[0] if req.error else None for req in conn.pending]
+
+def test_oversized_content_length_rejected_at_headers():
+    conn = _feed(f'POST /recognize HTTP/1.1\r\nContent-Length: {MAX_CONTENT_LENGTH + 1}\r\n\r\n'.encode())
+    assert _errors(conn) == [HTTPStatus.REQUEST_ENTITY_TOO_LARGE]
+    assert not conn.pending[0].keep_alive
+
+def test_long_url_rejected():
+    conn = _feed(b'GET /' + b'a' * uring_server.MAX_LINE_SIZE)
+    assert _errors(conn) == [HTTPStatus.REQUEST_URI_TOO_LONG]
+
+def test_too_many_headers_rejected():
+    headers = b''.join(b'X-%d: a\r\n' % i for i in range(uring_server.MAX_HEADERS + 1))
+    conn = _feed(b'GET /health HTTP/1.1\r\n' + headers + b'\r\n')
+    assert _errors(conn) == [HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE]
+
+def test_rejection_keeps_pipelined_order():
+    conn = _feed(b'GET /health HTTP/1.1\r\n\r\n'
+                 b'POST /recognize HTTP/1.1\r\nContent-Length: 1000000000\r\n\r\n')
+    assert _errors(conn) == [None, HTTPStatus.REQUEST_ENTITY_TOO_LARGE]
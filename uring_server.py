@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+验证码识别 HTTP 服务 (io_uring 版本，仅 Linux >= 5.7，Python 3.10+ 需要 os.eventfd)
+单线程 io_uring 事件循环：accept / recv / send / close 全部通过 SQ/CQ 批量提交，
+每轮循环只有一次 io_uring_enter；HTTP 请求由 httptools (llhttp) 解析。
+OCR 投递到 server.py 的 OCR 工作线程池，完成后通过 eventfd 唤醒事件循环发送响应。
+路由与响应格式与 server.py 保持一致：/、/health、/docs、POST /recognize。
+
+依赖：pip install liburing httptools
+启动：python uring_server.py [port]
+"""
+from __future__ import annotations
+
+import os
+import sys
+import time
+import json
+import queue
+import select
+import socket
+import logging
+from collections import deque
+from concurrent.futures import Future
+from http import HTTPStatus
+from urllib.parse import urlparse
+
+import httptools
+from liburing import (
+    Ring, Cqe,
+    io_uring_queue_init, io_uring_queue_exit,
+    io_uring_get_sqe, io_uring_sqe_set_data64, io_uring_submit,
+    io_uring_peek_cqe, io_uring_cqe_seen, io_uring_cq_ready,
+    io_uring_prep_accept, io_uring_prep_recv, io_uring_prep_send, io_uring_prep_close,
+)
+
+from server import (
+    DEFAULT_PORT,
+    MAX_CONTENT_LENGTH,
+    OCR_TIMEOUT,
+    PREWARM_OCR,
+    RecognizeError,
+    get_ocr_pool,
+    lookup_cached_result,
+    submit_ocr,
+    finish_ocr,
+    ocr_timeout_error,
+    render_status_page,
+    start_log_listener,
+    validate_base64,
+    static_not_modified,
+    _load_static_entry,
+    _CORS_HEADER_BLOCK,
+    _loads,
+    _dumps,
+    new_request_id,
+    build_success_body,
+)
+
+# ==================== 配置部分 ====================
+RING_ENTRIES = int(os.environ.get('RING_ENTRIES', 4096))
+RECV_BUFFER_SIZE = 64 * 1024
+# 与 server.py（http.server）一致：请求行与单个请求头最长 64KB，最多 100 个请求头
+MAX_LINE_SIZE = 64 * 1024
+MAX_HEADERS = 100
+# httptools 会在内部缓冲未收完的请求头，按请求头总字节数兜底
+MAX_HEAD_SIZE = MAX_LINE_SIZE * (MAX_HEADERS + 1)
+
+logger = logging.getLogger(__name__)
+
+# user_data 低 3 位为操作类型，其余位为 fd
+_OP_ACCEPT, _OP_RECV, _OP_SEND, _OP_CLOSE = 1, 2, 3, 4
+
+# ==================== HTTP 连接状态 ====================
+class _RequestRejected(Exception):
+    pass
+
+class _Request:
+    __slots__ = ('method', 'path', 'headers', 'body', 'keep_alive', 'error', 'request_id', 'start_time',
+                 'cache_key')
+
+    def __init__(self):
+        self.method = ''
+        self.path = ''
+        self.headers: dict[str, str] = {}
+        self.body = bytearray()
+        self.keep_alive = False
+        self.error: tuple[HTTPStatus, str] | None = None  # 请求超限时直接返回的错误，返回后关闭连接
+        self.request_id = None
+        self.start_time = 0.0
+        self.cache_key = b''
+
+class _Conn:
+    """单个客户端连接；同一时刻最多只有一个未完成的 recv/send/close 操作"""
+
+    def __init__(self, fd: int):
+        self.fd = fd
+        self.recv_buf = bytearray(RECV_BUFFER_SIZE)
+        self.parser = httptools.HttpRequestParser(self)
+        self.current: _Request | None = None
+        self._url = bytearray()
+        self._header_count = 0
+        self.reading_head = False
+        self.head_size = 0
+        self.rejected = False
+        self.pending: deque[_Request] = deque()
+        self.out = b''   # 待发送数据，需在 send 完成前保持引用
+        self.close_after_send = False
+        self.inflight: _Request | None = None   # 正在等待 OCR 结果的请求
+        self.future: Future | None = None
+        self.deadline = 0.0
+
+    def reject(self, status: HTTPStatus, message: str):
+        """当前请求超限：排在已解析的请求之后返回错误并关闭连接，不再解析后续数据"""
+        req = self.current or _Request()
+        req.error = (status, message)
+        req.keep_alive = False
+        self.pending.append(req)
+        self.current = None
+        self.rejected = True
+
+    def _too_large(self):
+        self.reject(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"请求体过大，最大支持 {MAX_CONTENT_LENGTH//1024//1024}MB")
+        raise _RequestRejected
+
+    # ---- httptools 回调 ----
+    # 超限时抛出 _RequestRejected 中止 feed_data（httptools 包装为 HttpParserCallbackError）
+    def on_message_begin(self):
+        self.current = _Request()
+        self._url = bytearray()
+        self._header_count = 0
+        self.reading_head = True
+        self.head_size = 0
+
+    def on_url(self, url: bytes):
+        self._url += url
+        if len(self._url) > MAX_LINE_SIZE:
+            self.reject(HTTPStatus.REQUEST_URI_TOO_LONG, "请求行过长")
+            raise _RequestRejected
+
+    def on_header(self, name: bytes, value: bytes):
+        self._header_count += 1
+        if self._header_count > MAX_HEADERS:
+            self.reject(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "请求头过多")
+            raise _RequestRejected
+        if len(name) + len(value) > MAX_LINE_SIZE:
+            self.reject(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "请求头过长")
+            raise _RequestRejected
+        self.current.headers[name.decode('latin-1').lower()] = value.decode('latin-1')
+
+    def on_headers_complete(self):
+        self.reading_head = False
+        req = self.current
+        req.method = self.parser.get_method().decode('ascii')
+        req.path = urlparse(self._url.decode('latin-1')).path
+        req.keep_alive = self.parser.should_keep_alive()
+        try:
+            too_large = int(req.headers.get('content-length', 0)) > MAX_CONTENT_LENGTH
+        except ValueError:
+            too_large = False
+        if too_large:
+            # 不读取请求体，直接返回 413
+            self._too_large()
+
+    def on_body(self, body: bytes):
+        req = self.current
+        if len(req.body) + len(body) > MAX_CONTENT_LENGTH:
+            self._too_large()
+        req.body += body
+
+    def on_message_complete(self):
+        self.pending.append(self.current)
+        self.current = None
+
+# ==================== 响应构造 ====================
+def _build_response(status: int | HTTPStatus, body: bytes = b'', content_type: str | None = 'application/json',
+                    headers: list[tuple[str, str]] | None = None, keep_alive: bool = False) -> bytes:
+    status = HTTPStatus(status)
+    lines = [f"HTTP/1.1 {status.value} {status.phrase}"]
+    if content_type:
+        lines.append(f"Content-Type: {content_type}")
+    lines.append(f"Content-Length: {len(body)}")
+    for k, v in (headers or []):
+        lines.append(f"{k}: {v}")
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    head = ('\r\n'.join(lines) + '\r\n').encode('latin-1')
+    return head + _CORS_HEADER_BLOCK + b'\r\n' + body
+
+def _error_response(req: _Request, status_code: int | HTTPStatus, message: str) -> bytes:
+    code = int(status_code)
+    resp = {
+        "success": False,
+        "code": code,
+        "message": message,
+        "request_id": req.request_id,
+        "data": None
+    }
+    logger.warning("请求错误 %s: %s", code, message, extra={'request_id': req.request_id or 'n/a'})
+    return _build_response(code, _dumps(resp), keep_alive=req.keep_alive)
+
+# ==================== io_uring 服务 ====================
+class UringServer:
+    def __init__(self, port: int):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(('0.0.0.0', port))
+        self.sock.listen(1024)
+        self.port = self.sock.getsockname()[1]
+
+        self.ring = Ring()
+        self.cqe = Cqe()
+        io_uring_queue_init(RING_ENTRIES, self.ring)
+
+        self.conns: dict[int, _Conn] = {}
+        self.busy_conns: set[_Conn] = set()  # 正在等待 OCR 结果的连接，超时检查只扫描这些
+        # OCR 完成通知：工作线程把结果放入队列并写 eventfd，事件循环 poll 到后统一处理
+        self.done_q: queue.SimpleQueue = queue.SimpleQueue()
+        self.wake_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC)
+
+    # ---- SQE 提交 ----
+    def _sqe(self, fd: int, op: int):
+        sqe = io_uring_get_sqe(self.ring)
+        if sqe is None:
+            # SQ 已满：先提交已有条目再取
+            io_uring_submit(self.ring)
+            sqe = io_uring_get_sqe(self.ring)
+        io_uring_sqe_set_data64(sqe, (fd << 3) | op)
+        return sqe
+
+    def _submit_accept(self):
+        io_uring_prep_accept(self._sqe(self.sock.fileno(), _OP_ACCEPT), self.sock.fileno())
+
+    def _submit_recv(self, conn: _Conn):
+        io_uring_prep_recv(self._sqe(conn.fd, _OP_RECV), conn.fd, conn.recv_buf)
+
+    def _submit_send(self, conn: _Conn, data: bytes, close_after: bool):
+        conn.out = data
+        conn.close_after_send = close_after
+        io_uring_prep_send(self._sqe(conn.fd, _OP_SEND), conn.fd, conn.out)
+
+    def _submit_close(self, conn: _Conn):
+        self.conns.pop(conn.fd, None)
+        self.busy_conns.discard(conn)
+        io_uring_prep_close(self._sqe(conn.fd, _OP_CLOSE), conn.fd)
+
+    # ---- 事件循环 ----
+    def serve_forever(self):
+        self._submit_accept()
+        poller = select.poll()
+        poller.register(self.ring.ring_fd, select.POLLIN)
+        poller.register(self.wake_fd, select.POLLIN)
+        try:
+            while True:
+                io_uring_submit(self.ring)
+                # poll 会释放 GIL，OCR 工作线程在此期间正常运行；有等待 OCR 的连接时按最近的超时时间醒来
+                poller.poll(self._poll_timeout_ms())
+                self._reap_completions()
+                self._drain_ocr_results()
+                self._expire_ocr_jobs()
+        finally:
+            io_uring_queue_exit(self.ring)
+            os.close(self.wake_fd)
+            self.sock.close()
+
+    def _reap_completions(self):
+        for _ in range(io_uring_cq_ready(self.ring)):
+            try:
+                io_uring_peek_cqe(self.ring, self.cqe)
+            except BlockingIOError:
+                break
+            except OSError:
+                pass  # 负的 res 会在 peek 时抛出，这里按 errno 取回
+            entry = self.cqe[0]
+            user_data = entry.user_data
+            try:
+                res = entry.res
+            except OSError as e:
+                res = -e.errno
+            io_uring_cqe_seen(self.ring, entry)
+            self._dispatch(user_data >> 3, user_data & 0b111, res)
+
+    def _dispatch(self, fd: int, op: int, res: int):
+        if op == _OP_ACCEPT:
+            self._submit_accept()
+            if res >= 0:
+                conn = _Conn(res)
+                self.conns[res] = conn
+                self._submit_recv(conn)
+            return
+
+        conn = self.conns.get(fd)
+        if conn is None:
+            return
+        if op == _OP_RECV:
+            if res <= 0:
+                self._submit_close(conn)
+                return
+            if conn.reading_head:
+                conn.head_size += res
+            try:
+                conn.parser.feed_data(conn.recv_buf[:res])
+                if conn.reading_head and conn.head_size > MAX_HEAD_SIZE:
+                    conn.reject(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "请求头过长")
+            except httptools.HttpParserError:
+                if conn.rejected:
+                    self._process(conn)
+                    return
+                req = conn.current or _Request()
+                req.keep_alive = False
+                self._submit_send(conn, _error_response(req, HTTPStatus.BAD_REQUEST, "无效的 HTTP 请求"), True)
+                return
+            self._process(conn)
+        elif op == _OP_SEND:
+            if res < 0:
+                self._submit_close(conn)
+                return
+            conn.out = conn.out[res:]
+            if conn.out:
+                io_uring_prep_send(self._sqe(conn.fd, _OP_SEND), conn.fd, conn.out)
+            elif conn.close_after_send:
+                self._submit_close(conn)
+            else:
+                self._process(conn)
+
+    def _process(self, conn: _Conn):
+        """处理下一个已解析完的请求；没有则继续读"""
+        if not conn.pending:
+            self._submit_recv(conn)
+            return
+        req = conn.pending.popleft()
+        req.request_id = new_request_id()
+        req.start_time = time.time()
+        try:
+            response = self._handle(conn, req)
+        except Exception:
+            logger.exception("请求处理出错", extra={'request_id': req.request_id})
+            response = _error_response(req, HTTPStatus.INTERNAL_SERVER_ERROR, "服务器内部错误")
+        if response is not None:
+            self._submit_send(conn, response, not req.keep_alive)
+
+    # ---- 路由 ----
+    def _handle(self, conn: _Conn, req: _Request) -> bytes | None:
+        if req.error is not None:
+            return _error_response(req, *req.error)
+        if req.method == 'OPTIONS':
+            return _build_response(200, content_type=None, keep_alive=req.keep_alive)
+        if req.method == 'GET':
+            return self._handle_get(req)
+        if req.method == 'POST':
+            return self._handle_recognize(conn, req)
+        return _error_response(req, HTTPStatus.NOT_IMPLEMENTED, "不支持的请求方法")
+
+    def _handle_get(self, req: _Request) -> bytes:
+        path = req.path
+        if path == '/docs' or path == '/docs/':
+            return self._static_response(req, 'index.html')
+        if path.startswith('/docs/'):
+            return self._static_response(req, path[len('/docs/'):] or 'index.html')
+        if path == '/':
+            page = render_status_page(f"http://localhost:{self.port}", " (io_uring版)")
+            return _build_response(200, page, 'text/html', keep_alive=req.keep_alive)
+        if path == '/health':
+            resp = {
+                "status": "healthy",
+                "service": "captcha-ocr",
+                "timestamp": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            }
+            return _build_response(200, _dumps(resp), keep_alive=req.keep_alive)
+        return _error_response(req, HTTPStatus.NOT_FOUND, "接口不存在")
+
+    def _static_response(self, req: _Request, rel_path: str) -> bytes:
+        try:
+            entry = _load_static_entry(rel_path)
+        except ValueError:
+            return _error_response(req, HTTPStatus.BAD_REQUEST, "无效的路径")
+        except FileNotFoundError:
+            return _error_response(req, HTTPStatus.NOT_FOUND, "资源不存在")
+
+        use_gzip = entry.gzip_data is not None and 'gzip' in req.headers.get('accept-encoding', '')
+        headers = [
+            ('ETag', entry.gzip_etag if use_gzip else entry.etag),
+            ('Last-Modified', entry.last_modified),
+            ('Cache-Control', 'public, max-age=3600'),
+        ]
+        if entry.gzip_data is not None:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if static_not_modified(entry, req.headers.get('if-none-match'), req.headers.get('if-modified-since')):
+            return _build_response(HTTPStatus.NOT_MODIFIED, content_type=None, headers=headers,
+                                   keep_alive=req.keep_alive)
+        if entry.data is None:
+            # 超出缓存上限的大文件：直接读入后经 io_uring send 发出
+            with open(entry.path, 'rb') as f:
+                body = f.read()
+        else:
+            body = entry.gzip_data if use_gzip else entry.data
+            if use_gzip:
+                headers.append(('Content-Encoding', 'gzip'))
+        return _build_response(200, body, entry.content_type, headers, req.keep_alive)
+
+    def _handle_recognize(self, conn: _Conn, req: _Request) -> bytes | None:
+        if req.path != '/recognize':
+            return _error_response(req, HTTPStatus.NOT_FOUND, "接口不存在，请使用 POST /recognize")
+        if not req.body:
+            return _error_response(req, HTTPStatus.BAD_REQUEST, "请求体为空")
+
+        try:
+            data = _loads(bytes(req.body))
+        except json.JSONDecodeError as e:
+            return _error_response(req, HTTPStatus.BAD_REQUEST, f"JSON 格式错误: {str(e)}")
+        req.body = bytearray()
+
+        if not isinstance(data, dict) or 'base64' not in data:
+            return _error_response(req, HTTPStatus.BAD_REQUEST, "缺少 base64 字段")
+        base64_str = data['base64']
+        if not isinstance(base64_str, str) or len(base64_str) < 10:
+            return _error_response(req, HTTPStatus.BAD_REQUEST, "base64 字符串无效或太短")
+
+        try:
+            pure = validate_base64(base64_str)
+        except ValueError as e:
+            return _error_response(req, HTTPStatus.BAD_REQUEST, str(e))
+
+        req.cache_key, result_text = lookup_cached_result(pure)
+        if result_text is not None:
+            return self._success_response(req, result_text, cached=True)
+
+        try:
+            # 在事件循环线程中执行，不做大图像素解码，留给 OCR 线程
+            fut = submit_ocr(pure, req.request_id, shrink_large=False)
+        except RecognizeError as e:
+            return _error_response(req, e.status, e.message)
+
+        self.busy_conns.add(conn)
+        conn.inflight = req
+        conn.future = fut
+        conn.deadline = time.monotonic() + OCR_TIMEOUT
+
+        def _done(f, conn=conn, req=req):
+            self.done_q.put((conn, req, f))
+            os.eventfd_write(self.wake_fd, 1)
+
+        fut.add_done_callback(_done)
+        return None
+
+    # ---- OCR 结果 ----
+    def _drain_ocr_results(self):
+        try:
+            os.eventfd_read(self.wake_fd)
+        except BlockingIOError:
+            return
+        while True:
+            try:
+                conn, req, fut = self.done_q.get_nowait()
+            except queue.Empty:
+                break
+            if conn.future is not fut or conn not in self.busy_conns:
+                continue  # 已超时处理或连接已关闭
+            self.busy_conns.discard(conn)
+            conn.future = None
+            try:
+                response = self._success_response(req, finish_ocr(req.cache_key, fut, req.request_id))
+            except RecognizeError as e:
+                response = _error_response(req, e.status, e.message)
+            self._submit_send(conn, response, not req.keep_alive)
+
+    def _poll_timeout_ms(self) -> int:
+        if not self.busy_conns:
+            return 1000
+        remaining = min(c.deadline for c in self.busy_conns) - time.monotonic()
+        return max(0, min(1000, int(remaining * 1000) + 1))
+
+    def _expire_ocr_jobs(self):
+        if not self.busy_conns:
+            return
+        now = time.monotonic()
+        for conn in [c for c in self.busy_conns if now > c.deadline]:
+            self.busy_conns.discard(conn)
+            req = conn.inflight
+            req.keep_alive = False
+            # 取消仍在排队的任务，避免超时请求继续占用 OCR 工作线程
+            e = ocr_timeout_error(conn.future, req.request_id)
+            conn.future = None
+            self._submit_send(conn, _error_response(req, e.status, e.message), True)
+
+    def _success_response(self, req: _Request, result_text: str, cached: bool = False) -> bytes:
+        processing_time = (time.time() - req.start_time) * 1000.0
+        logger.info("识别成功: %s, 耗时: %.2fms%s", result_text, processing_time, " (缓存)" if cached else "",
+                    extra={'request_id': req.request_id})
+        return _build_response(200, build_success_body(req.request_id, result_text, processing_time, cached),
+                               keep_alive=req.keep_alive)
+
+# ==================== 主程序入口 ====================
+if __name__ == '__main__':
+    port = int(os.environ.get('PORT', DEFAULT_PORT))
+    if len(sys.argv) > 1:
+        try:
+            p = int(sys.argv[1])
+            if 1 <= p <= 65535:
+                port = p
+            else:
+                print(f"⚠️ 端口号 {p} 无效，使用默认端口 {port}")
+        except ValueError:
+            print(f"⚠️ 端口参数无效，使用默认端口 {port}")
+
+    start_log_listener()
+    try:
+        server = UringServer(port)
+    except OSError as e:
+        print(f"❌ io_uring 初始化失败（需要 Linux >= 5.7）: {e}")
+        sys.exit(1)
+
+    if PREWARM_OCR:
+        try:
+            get_ocr_pool()
+        except Exception:
+            logger.exception("OCR 预热失败（忽略）", extra={'request_id': 'startup'})
+
+    logger.info("🚀 验证码识别服务 (io_uring) 启动: http://0.0.0.0:%d", server.port, extra={'request_id': 'startup'})
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("服务已停止", extra={'request_id': 'startup'})